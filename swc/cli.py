@@ -10,13 +10,14 @@ The module consists of several key functions:
 - cli: The main entry point for the Click command-line interface.
 - parse_file: Reads the text from the file and generates output based on the 
   provided parameters and their order.
-- get_wc_values: Computes byte, line, word, and character counts for a given 
-  text string.
-- byte_or_char: Determines the last recognized parameter from a list of ordered 
-  parameters, used to decide whether to count bytes or characters when both 
-  options are specified.
-- create_output: Formats the counts into a string for output based on specified 
-  parameters and their order.
+- get_output_plan: Resolves which counts to calculate and print for a combination
+  of options, once per combination.
+- read_chunks: Reads a file in fixed-size chunks so it never has to be held in
+  memory all at once.
+- can_mmap: Checks whether a file is a non-empty regular file that read_chunks
+  can memory-map.
+- get_wc_values: Computes byte, line, word, and character counts for the raw
+  bytes read from a file, one chunk at a time.
 
 This module exemplifies advanced usage of the Click library to implement 
 command-line utilities with behavior dependent on the order of options.
@@ -31,11 +32,35 @@ Note:
 """
 
 import click
+import functools
 import io
-import sys
+import mmap
+import os
+import stat
 
 from click.core import Context
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
+
+# Number of bytes read from the file at a time
+CHUNK_SIZE = 1 << 16
+
+# Bytes of the form 0b10xxxxxx only ever continue a multi-byte UTF-8 sequence,
+# so every other byte marks the start of a new character.
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# Maps ASCII whitespace bytes to 0x00 and every other byte to 0x01, so the
+# start of a word shows up as the pair b"\x00\x01" in a translated chunk.
+WORD_BYTE_TABLE = bytes(byte not in b" \t\n\r\x0b\x0c" for byte in range(256))
+
+# Positions of the line, word, byte, and character counts in the values returned
+# by get_wc_values, in the order wc prints them
+OUTPUT_ORDER = (1, 2, 0, 3)
+
+# Parameters that decide between printing the byte or the character count
+BYTE_OR_CHAR_PARAMS = frozenset(("count", "chars"))
+
+# Context meta key holding the last of those parameters passed on the command line
+LAST_BYTE_OR_CHAR_KEY = "swc.last_byte_or_char"
 
 
 class OrderedOptionsCommand(click.Command):
@@ -44,169 +69,220 @@ class OrderedOptionsCommand(click.Command):
     parameters passed to program. The Linux WC command's output varies
     depending on the order -c and -m are passed to it.
 
-    This class will help output the correct values
+    This class will help output the correct values. Only the last of -c and -m
+    matters, so that is all it records, in the context's meta under
+    LAST_BYTE_OR_CHAR_KEY. It is taken from the parser Click already uses so the
+    arguments are only parsed once.
     """
 
-    _options = []
+    def make_parser(self, ctx: Context):
+        parser = super().make_parser(ctx)
+        parse_args = parser.parse_args
 
-    def parse_args(self, ctx: Context, args: List[str]) -> List[str]:
-        parser = self.make_parser(ctx)
-        _, _, param_order = parser.parse_args(args=list(args))
-        for param in param_order:
-            self._options.append(param.name)
+        def parse_args_in_order(args: List[str]):
+            opts, largs, param_order = parse_args(args=args)
+            last_byte_or_char = None
+            for param in param_order:
+                if param.name in BYTE_OR_CHAR_PARAMS:
+                    last_byte_or_char = param.name
+            ctx.meta[LAST_BYTE_OR_CHAR_KEY] = last_byte_or_char
+            return opts, largs, param_order
 
-        return super().parse_args(ctx, args)
+        parser.parse_args = parse_args_in_order
+        return parser
 
 
 @click.command(cls=OrderedOptionsCommand)
-@click.argument("file", type=click.File("r"), default=sys.stdin)
+@click.argument("file", type=click.File("rb"), default="-")
 @click.option("-c", "--count", is_flag=True, help="Count number of bytes in file")
 @click.option("-l", "--lines", is_flag=True, help="Count number of lines in file")
 @click.option("-w", "--words", is_flag=True, help="Count number of words in file")
 @click.option("-m", "--chars", is_flag=True, help="Count number of characters in file")
 @click.version_option()
-def cli(file: io.TextIOWrapper, count: bool, lines: bool, words: bool, chars: bool):
+@click.pass_context
+def cli(
+    ctx: Context,
+    file: io.BufferedReader,
+    count: bool,
+    lines: bool,
+    words: bool,
+    chars: bool,
+):
     "Reimplementing the wc linux command for a challenge"
     params = (count, lines, words, chars)
-    output = parse_file(file, params, OrderedOptionsCommand._options)
+    output = parse_file(file, params, ctx.meta.get(LAST_BYTE_OR_CHAR_KEY, None))
     click.echo(output)
 
 
 def parse_file(
-    file: io.TextIOWrapper,
+    file: io.BufferedReader,
     params: Tuple[bool, bool, bool, bool],
-    ordered_params: List[str],
+    last_param: Optional[str],
 ):
-    text = file.read()
-    last_param = byte_or_char(ordered_params)
-    output = create_output(params, get_wc_values(text), last_param)
-    output_w_filename = output + f" {file.name}"
+    needed, order = get_output_plan(params, last_param)
+    values = get_wc_values(read_chunks(file), needed)
+    output = "\t".join([f"{values[index]}" for index in order])
 
-    return output_w_filename
+    return f"{output} {file.name}"
 
 
-def get_wc_values(text: str):
-    """Calculates various counts (byte, line, word, and character) for the given text.
+@functools.lru_cache(maxsize=None)
+def get_output_plan(
+    params: Tuple[bool, bool, bool, bool], last_param: Optional[str]
+) -> Tuple[Tuple[bool, bool, bool, bool], Tuple[int, ...]]:
+    """Works out which counts to calculate and print for a combination of options.
 
-    This function computes four different counts for a given string: the byte count
-    when encoded in UTF-8, the line count, the word count, and the character count.
-    The line count is determined based on the number of newline characters. The
-    word count is based on the number of words separated by whitespace. The
-    character count is simply the length of the text. The byte count is calculated
-    by encoding the text as UTF-8 and counting the number of bytes.
+    There are only sixteen combinations of flags, and 'count' and 'chars' can
+    only be ordered two ways, so the choice of counts is resolved once per
+    combination and cached. If none of the flags are set, the line, word, and
+    byte counts are used. If both 'count' and 'chars' are set, only the one
+    passed last is used. Counts are always printed in the order lines, words,
+    bytes, characters.
 
     Args:
-        text (str): The input text for which the counts are to be computed.
+        params (Tuple[bool, bool, bool, bool]): A tuple of booleans indicating
+            which counts were requested, in the order count, lines, words, chars.
+        last_param (Optional[str]): The last recognized parameter ('count' or
+            'chars'), or None if neither was passed.
 
     Returns:
-        tuple: A tuple containing four string elements in the following order:
-            - byte_count: The number of bytes in the text when encoded in UTF-8.
-            - line_count: The number of lines in the text.
-            - word_count: The number of words in the text.
-            - char_count: The number of characters in the text.
+        tuple: A tuple containing two elements:
+            - needed: The counts get_wc_values has to calculate, in the same
+              order as params.
+            - order: The positions, in the values returned by get_wc_values, of
+              the counts to print, in the order they are printed.
 
     Example:
-        >>> get_wc_values("Hello world\nThis is a test")
-        ('27', '1', '5', '23')
+        >>> get_output_plan((False, False, False, False), None)
+        ((True, True, True, False), (1, 2, 0))
+        >>> get_output_plan((True, False, True, True), "chars")
+        ((False, False, True, True), (2, 3))
 
     """
-    byte_count = str(len(text.encode("utf-8")))
-    line_count = str(len(["c" for c in text if c == "\n"]))
-    word_count = str(len(text.split()))
-    char_count = str(len(text))
+    count, lines, words, chars = params
+    if not (count or lines or words or chars):
+        count = lines = words = True
+    elif count and chars:
+        count = last_param == "count"
+        chars = not count
 
-    return byte_count, line_count, word_count, char_count
+    needed = (count, lines, words, chars)
+    order = tuple(index for index in OUTPUT_ORDER if needed[index])
 
+    return needed, order
 
-def byte_or_char(ordered_params: List[str]):
-    """Determines the last recognized parameter from a list of ordered parameters.
 
-    This function iterates over a list of parameters and identifies the last
-    recognized parameter, either 'count' or 'chars'. It ignores any unrecognized
-    parameters. The Linux WC command's output varies depending on the order
-    -c and -m are passed to it.
+def read_chunks(file: io.BufferedReader, chunk_size: int = CHUNK_SIZE):
+    """Reads the file in fixed-size chunks until it is exhausted.
 
-    Args:
-        ordered_params (List[str]): A list of parameters, where each parameter
-            is a string. The function recognizes 'count' and 'chars' as valid
-            parameters.
+    Reading in chunks keeps memory use bounded by the chunk size instead of the
+    size of the file. Non-empty regular files are memory-mapped and sliced from
+    the current position of the file, which saves a read system call per chunk
+    and lets the kernel read ahead of the counting. Streams such as pipes, and
+    any file that fails to map, are read normally.
 
-    Returns:
-        str: The last recognized parameter ('count' or 'chars'). If neither is
-            found, returns None.
+    Args:
+        file (io.BufferedReader): The file opened in binary mode.
+        chunk_size (int): The maximum number of bytes to read at a time.
 
-    Example:
-        >>> byte_or_char(["size", "count", "volume", "chars"])
-        'chars'
-        >>> byte_or_char(["size", "volume", "shape"])
-        None
+    Yields:
+        bytes: The next non-empty chunk of the file.
 
     """
-    last_param = None
+    mapped = None
+    if can_mmap(file):
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Some pseudo-files claim to be non-empty regular files but cannot
+            # be mapped, and a file may be truncated after it was checked
+            pass
 
-    for param in ordered_params:
-        if param == "count":
-            last_param = "count"
-        if param == "chars":
-            last_param = "chars"
+    if mapped is None:
+        while chunk := file.read(chunk_size):
+            yield chunk
+        return
 
-    return last_param
+    with mapped:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        for start in range(file.tell(), len(mapped), chunk_size):
+            yield mapped[start : start + chunk_size]
 
 
-def create_output(
-    params: Tuple[bool, bool, bool, bool],
-    values: Tuple[int, int, int, int],
-    last_param: str,
-):
-    """Formats the word count values into a tab-separated string for output.
+def can_mmap(file: io.BufferedReader) -> bool:
+    """Checks whether the file is a non-empty regular file that may be mapped.
+
+    Passing this check does not guarantee that mapping succeeds, since some
+    pseudo-files report a size but cannot be mapped.
+
+    Args:
+        file (io.BufferedReader): The file opened in binary mode.
+
+    Returns:
+        bool: True if the file is worth trying to memory-map, False otherwise.
 
-    This function takes the count parameters (bytes, lines, words, characters),
-    their respective values, and the last recognized parameter to format the
-    output string. The function checks which parameters are set to True and
-    includes their corresponding values in the output. If both 'count' and 'chars'
-    are specified, it uses the value of the last parameter to determine which
-    count to include. If none of the parameters are set, it defaults to showing
-    line, word, and byte counts.
+    """
+    try:
+        file_stat = os.fstat(file.fileno())
+    except (OSError, io.UnsupportedOperation):
+        return False
+
+    return stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > 0
+
+
+def get_wc_values(chunks: Iterable[bytes], params: Tuple[bool, bool, bool, bool]):
+    """Calculates various counts (byte, line, word, and character) for the given data.
+
+    This function computes four different counts for the raw contents of a file,
+    given as consecutive chunks of bytes: the byte count, the line count, the
+    word count, and the character count. The line count is determined based on
+    the number of newline characters. The word count is based on the number of
+    words separated by ASCII whitespace, found by counting the places where
+    whitespace is followed by anything else, taking care not to count a word
+    split across two chunks twice. The byte count is simply the length of the data.
+    The character count is the number of bytes that are not UTF-8 continuation
+    bytes, which avoids decoding the data and does not depend on where the
+    chunks are split. Only the counts selected by params are calculated; the
+    default counts for when no flag is passed are resolved by get_output_plan.
 
     Args:
+        chunks (Iterable[bytes]): The input data for which the counts are to be
+            computed, split into chunks.
         params (Tuple[bool, bool, bool, bool]): A tuple of booleans indicating
-            which counts to include in the output. The order is:
-            - count: Include byte count if True.
-            - lines: Include line count if True.
-            - words: Include word count if True.
-            - chars: Include character count if True.
-        values (Tuple[int, int, int, int]): A tuple containing the counts for
-            bytes, lines, words, and characters, in that order.
-        last_param (str): The last recognized parameter ('count' or 'chars')
-            used to resolve the precedence between byte and character counts.
+            which counts to calculate, in the order count, lines, words, chars.
+            Counts that are not calculated are reported as 0.
 
     Returns:
-        str: A tab-separated string of the requested counts.
+        tuple: A tuple containing four integer elements in the following order:
+            - byte_count: The number of bytes in the data.
+            - line_count: The number of lines in the data.
+            - word_count: The number of words in the data.
+            - char_count: The number of UTF-8 characters in the data.
 
     Example:
-        >>> create_output((True, True, False, False), (1024, 50, 200, 980), "count")
-        '50\t1024'
-        >>> create_output((True, False, True, True), (1024, 50, 200, 980), "chars")
-        '200\t980'
+        >>> get_wc_values([b"Hello world\nThis is a test"], (True, True, True, True))
+        (26, 1, 6, 26)
+        >>> get_wc_values([b"Hello wo", b"rld\n"], (False, False, True, False))
+        (0, 0, 2, 0)
 
     """
     count, lines, words, chars = params
-    byte_count, line_count, word_count, char_count = values
-
-    if not any([count, lines, words, chars]):
-        return f"{line_count}\t{word_count}\t{byte_count}"
-
-    output = []
-    if lines:
-        output.append(line_count)
-    if words:
-        output.append(word_count)
-    if count and chars:
-        output.append(byte_count if last_param == "count" else char_count)
-    else:
+
+    byte_count = line_count = word_count = char_count = 0
+    in_word = False
+    for chunk in chunks:
         if count:
-            output.append(byte_count)
+            byte_count += len(chunk)
+        if lines:
+            line_count += chunk.count(b"\n")
+        if words:
+            marks = chunk.translate(WORD_BYTE_TABLE)
+            word_count += marks.count(b"\x00\x01")
+            if not in_word and marks.startswith(b"\x01"):
+                word_count += 1
+            in_word = marks.endswith(b"\x01")
         if chars:
-            output.append(char_count)
+            char_count += len(chunk.translate(None, UTF8_CONTINUATION_BYTES))
 
-    return "\t".join(output)
+    return byte_count, line_count, word_count, char_count
@@ -1,5 +1,10 @@
+import click
+import mmap
+import subprocess
+import sys
+
 from click.testing import CliRunner
-from swc.cli import cli
+from swc.cli import cli, get_wc_values
 
 
 def test_version():
@@ -8,3 +13,86 @@ def test_version():
         result = runner.invoke(cli, ["--version"])
         assert result.exit_code == 0
         assert result.output.startswith("cli, version ")
+
+
+def test_counts():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("test.txt", "wb") as f:
+            f.write("héllo world\r\nthis is a test\n".encode("utf-8"))
+
+        result = runner.invoke(cli, ["test.txt"])
+        assert result.exit_code == 0
+        assert result.output == "2\t6\t29 test.txt\n"
+
+        result = runner.invoke(cli, ["-m", "test.txt"])
+        assert result.exit_code == 0
+        assert result.output == "28 test.txt\n"
+
+
+def test_last_of_bytes_or_chars_wins():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("test.txt", "wb") as f:
+            f.write("héllo\n".encode("utf-8"))
+
+        result = runner.invoke(cli, ["-c", "-m", "test.txt"])
+        assert result.output == "6 test.txt\n"
+
+        result = runner.invoke(cli, ["-m", "-c", "test.txt"])
+        assert result.output == "7 test.txt\n"
+
+
+def test_words_split_across_chunks():
+    chunks = [b"hel", b"lo wor", b"ld", b" \n", b"again"]
+    values = get_wc_values(chunks, (True, True, True, True))
+    assert values == (18, 1, 3, 18)
+
+
+def test_stdin_from_partly_read_file(tmp_path):
+    path = tmp_path / "test.txt"
+    path.write_bytes(b"skip. hello world\nagain\n")
+
+    with open(path, "rb") as stdin:
+        stdin.seek(6)
+        result = subprocess.run(
+            [sys.executable, "-m", "swc"], stdin=stdin, capture_output=True
+        )
+
+    assert result.returncode == 0
+    assert result.stdout == b"2\t3\t18 <stdin>\n"
+
+
+def test_invoke_without_parsing():
+    @click.command()
+    @click.pass_context
+    def wrapper(ctx):
+        with open("test.txt", "rb") as file:
+            ctx.invoke(
+                cli, file=file, count=True, lines=False, words=False, chars=False
+            )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("test.txt", "wb") as f:
+            f.write(b"hello\n")
+
+        result = runner.invoke(wrapper)
+        assert result.exit_code == 0
+        assert result.output == "6 test.txt\n"
+
+
+def test_falls_back_to_read_when_mmap_fails(monkeypatch):
+    def fail_mmap(*args, **kwargs):
+        raise OSError(19, "No such device")
+
+    monkeypatch.setattr(mmap, "mmap", fail_mmap)
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("test.txt", "wb") as f:
+            f.write("héllo world\r\nthis is a test\n".encode("utf-8"))
+
+        result = runner.invoke(cli, ["-l", "-w", "-c", "test.txt"])
+        assert result.exit_code == 0
+        assert result.output == "2\t6\t29 test.txt\n"